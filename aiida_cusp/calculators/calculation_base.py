@@ -6,7 +6,9 @@ Base class serving as parent for other VASP calculator implementations
 """
 
 
-import pathlib
+import os
+import posixpath
+from collections import deque
 
 from aiida.engine import CalcJob
 from aiida.orm import RemoteData, Code, Int, Bool, Dict, List
@@ -33,6 +35,15 @@ def lidi_serializer(value):
     return Dict(dict=out)
 
 
+# names of the output namespaces parsed_results.node_00 to
+# parsed_results.node_99 for all possible neb image indices (built once on
+# import instead of every time define() is called)
+NEB_NODE_OUTPUT_NAMESPACES = tuple(
+    "{}.node_{:0>2d}".format(PluginDefaults.PARSER_OUTPUT_NAMESPACE, index)
+    for index in range(100)
+)
+
+
 class CalculationBase(CalcJob):
     """
     Base class implementing the basic inputs and features commond to all
@@ -44,6 +55,15 @@ class CalculationBase(CalcJob):
     _default_error_file = PluginDefaults.STDERR_FNAME
     _default_output_file = PluginDefaults.STDOUT_FNAME
 
+    def __init__(self, *args, **kwargs):
+        super(CalculationBase, self).__init__(*args, **kwargs)
+        # remote folder contents obtained by remote_filelist()
+        self._remote_filelist_cache = {}
+        # mpi arguments and vasp runline obtained by vasp_calc_mpi_args()
+        # and vasp_run_line()
+        self._vasp_mpi_args = None
+        self._vasp_run_line = None
+
     @classmethod
     def define(cls, spec):
         """
@@ -100,10 +120,35 @@ class CalculationBase(CalcJob):
             help=("If set to `False` POSCAR in the restarted calculation will "
                   "not be replaced with CONTCAR form parent calculation")
         )
+        spec.input(
+            'restart.symlink_large_files',
+            valid_type=Bool,
+            serializer=to_aiida_type,
+            required=False,
+            help=("If set to `True` large restart files (i.e. WAVECAR, "
+                  "CHGCAR, etc.) of the parent calculation are symlinked "
+                  "instead of copied if both calculations run on the same "
+                  "computer")
+        )
         # extend the metadata.options namespace with an additional
         # option to specify optional parser settings
         spec.input_namespace('metadata.options.parser_settings',
                              required=False, non_db=True, dynamic=True)
+        # optional tag marking calculations that may be packed into a single
+        # scheduler submission. the plugin itself does not use this tag, it
+        # is only stored as option on the calculation node (available via
+        # the node's get_option() method) for external tools submitting the
+        # tagged calculations in bulk. note that it is *not* passed to the
+        # scheduler plugin which only receives the job template
+        spec.input(
+            'metadata.options.bulk_job_group',
+            valid_type=str,
+            required=False,
+            non_db=True,
+            help=("Tag calculations sharing this value to mark them for "
+                  "being packed into a single scheduler submission by "
+                  "external bulk-submission tools")
+        )
         # this is the output node available to all connected parser for
         # storing their generated results (whatever these may be)
         spec.output_namespace(PluginDefaults.PARSER_OUTPUT_NAMESPACE,
@@ -111,9 +156,7 @@ class CalculationBase(CalcJob):
         # add dynamic sub-namespaces parsed_results.node_00 to
         # parsed_results.node_99 to provide possibly requird output ports for
         # neb results
-        for index in range(100):  # iterate over all possible neb image indices
-            neb_node_namespace = "{}.node_{:0>2d}".format(
-                                 PluginDefaults.PARSER_OUTPUT_NAMESPACE, index)
+        for neb_node_namespace in NEB_NODE_OUTPUT_NAMESPACES:
             spec.output_namespace(neb_node_namespace, required=False,
                                   dynamic=True)
 
@@ -123,9 +166,14 @@ class CalculationBase(CalcJob):
         not write **any** files which has to be implemented in the subclassed
         prepare_for_submission() method
         """
+        # discard values possibly cached by a previous call
+        self._remote_filelist_cache = {}
+        self._vasp_mpi_args = None
+        self._vasp_run_line = None
         # if no custodian code is defined directly run the VASP calculation,
         # i.e. initialize the CodeInfo for the passed VASP code
-        if not self.inputs.custodian.get('code', False):
+        custodian_code = self.inputs.custodian.get('code', None)
+        if custodian_code is None:
             codeinfo = CodeInfo()
             codeinfo.code_uuid = self.inputs.code.uuid
             codeinfo.stdout_name = self._default_output_file
@@ -135,7 +183,7 @@ class CalculationBase(CalcJob):
         # Code-inputs to generate the required prepend / append lines)
         else:
             codeinfo = CodeInfo()
-            codeinfo.code_uuid = self.inputs.custodian.code.uuid
+            codeinfo.code_uuid = custodian_code.uuid
             # define custodian-exe command line arguments
             codeinfo.cmdline_params = ['run', PluginDefaults.CSTDN_SPEC_FNAME]
             # never add the MPI command to custodian since it will call
@@ -165,21 +213,30 @@ class CalculationBase(CalcJob):
 
         This function is basically a copy of the procedure internally used
         by AiiDA in it's CalcJob.presubmit() method to build the list of
-        MPI and extra MPI parameters.
+        MPI and extra MPI parameters. The arguments are only built once
+        and cached for subsequent calls.
         """
+        if self._vasp_mpi_args is not None:
+            mpi_base_args, mpi_extra_args = self._vasp_mpi_args
+            return list(mpi_base_args), list(mpi_extra_args)
         computer = self.inputs.code.computer
         scheduler = computer.get_scheduler()
-        resources = self.inputs.metadata.options.resources
+        # work on a local copy of the resources to leave the inputs untouched
+        resources = dict(self.inputs.metadata.options.resources)
         default_cpus_machine = computer.get_default_mpiprocs_per_machine()
+        if default_cpus_machine is not None:
+            resources['default_mpiprocs_per_machine'] = default_cpus_machine
         job_resource = scheduler.create_job_resource(**resources)
         tot_num_mpiprocs = job_resource.get_tot_num_mpiprocs()
         mpi_arg_dict = {'tot_num_mpiprocs': tot_num_mpiprocs}
         for key, value in job_resource.items():
             mpi_arg_dict[key] = value
         mpirun_command = computer.get_mpirun_command()
-        mpi_base_args = [arg.format(**mpi_arg_dict) for arg in mpirun_command]
+        mpi_base_args = [arg.format_map(mpi_arg_dict)
+                         for arg in mpirun_command]
         mpi_extra_args = self.inputs.metadata.options.mpirun_extra_params
-        return mpi_base_args, mpi_extra_args
+        self._vasp_mpi_args = (mpi_base_args, list(mpi_extra_args))
+        return list(mpi_base_args), list(mpi_extra_args)
 
     def vasp_run_line(self):
         """
@@ -188,8 +245,11 @@ class CalculationBase(CalcJob):
 
         Populates the CalcInfo object with all required parameters such
         that the generated CalcInfo instance can be passed to the schedulers
-        _get_run_line() method to obtain the runline.
+        _get_run_line() method to obtain the runline. The runline is only
+        built once and cached for subsequent calls.
         """
+        if self._vasp_run_line is not None:
+            return list(self._vasp_run_line)
         # build the list of command line arguments forming the final
         # runline command
         vasp_exec = [self.inputs.code.get_execname()]
@@ -201,36 +261,61 @@ class CalculationBase(CalcJob):
         # Custodian requires the vasp-cmd be a list of arguments. Since we
         # also pass the stdout / stderr log-files directly to custodian we're
         # done at this point
-        return vasp_cmdline_params
+        self._vasp_run_line = vasp_cmdline_params
+        return list(vasp_cmdline_params)
 
     def remote_filelist(self, remote_data, relpath='.'):
         """
-        Recurse remote folder contents and return a list of all files found
+        Walk remote folder contents and return a list of all files found
         on the remote with the list containing the files names, relative
         paths and the absolute file path on the remote.
 
+        The walk is performed only once for every remote folder and
+        relative path and results are cached for subsequent calls.
+
         :returns: list of tuples of type (filename, absolut_path_on_remote,
             relative_path (without the filename)
         """
+        cache_key = (remote_data.uuid, relpath)
+        if cache_key in self._remote_filelist_cache:
+            return list(self._remote_filelist_cache[cache_key])
         filelist = []
-        import pathlib
-        for path in remote_data.listdir(relpath=relpath):
-            subpath = relpath + '/' + path
-            try:  # call listdir() on the given path and recurse
-                files = self.remote_filelist(remote_data, relpath=subpath)
-                filelist.extend(files)
-            except OSError:  # cannot call listdir() because subpath is file
-                # absolute file path on remote including the file name
-                abspath = remote_data.get_remote_path() + '/' + subpath
-                abspath = str(pathlib.Path(abspath).absolute())
-                relpath = str(pathlib.Path(relpath))
-                filelist.append((path, abspath, relpath))
-        return filelist
+        remote_root = remote_data.get_remote_path()
+        # walk the remote folder iteratively (breadth-first) using a single
+        # open transport for the whole walk instead of opening a new one for
+        # every RemoteData.listdir() call. files and folders are told apart
+        # by the isdir flag returned by listdir_withattributes() (note that
+        # the transport may still query the attributes of every entry)
+        # (folders are listed one after another since transports available
+        # for the supported AiiDA versions are neither asynchronous nor
+        # thread-safe)
+        with remote_data.get_authinfo().get_transport() as transport:
+            folders = deque([posixpath.normpath(relpath)])
+            while folders:
+                folder = folders.popleft()
+                # change to the folder and list the cwd: for the supported
+                # AiiDA versions listdir_withattributes() ignores its path
+                # argument and always lists the current working directory
+                transport.chdir(posixpath.join(remote_root, folder))
+                for entry in transport.listdir_withattributes('.'):
+                    path = entry['name']
+                    subpath = posixpath.normpath(posixpath.join(folder, path))
+                    if entry['isdir']:
+                        folders.append(subpath)
+                        continue
+                    # absolute file path on remote including the file name
+                    abspath = posixpath.normpath(posixpath.join(remote_root,
+                                                                subpath))
+                    filelist.append((path, abspath, folder))
+        self._remote_filelist_cache[cache_key] = filelist
+        return list(filelist)
 
     def restart_files_exclude(self):
         """
-        Create a list of files that will not be copied from the remote
+        Create a set of files that will not be copied from the remote
         restart folder to the current calculation folder.
+
+        :returns: frozenset of excluded file names
         """
         # files never copied for restarted calculations
         # (Return _aiidasubmit.sh to remain compatible with AiiDA versions
@@ -245,17 +330,30 @@ class CalculationBase(CalcJob):
         # do not copy POSCAR if replaced with CONTCAR
         if self.inputs.restart.get('contcar_to_poscar', True):
             exclude_files += [VaspDefaults.FNAMES['poscar']]
-        return exclude_files
+        return frozenset(exclude_files)
 
     def setup_custodian_settings(self, is_neb=False):
         """
         Create custodian settings instance from the given handlers and
         settings.
+
+        :returns: the custodian settings or `None` if no custodian code is
+            defined for the calculation
         """
+        # nothing to setup if the calculation is not run through custodian
+        if self.inputs.custodian.get('code', None) is None:
+            return None
         # setup the inputs to create the custodian settings from the passed
-        # parameters
-        settings = dict(self.inputs.custodian.get('settings', {}))
-        handlers = dict(self.inputs.custodian.get('handlers', {}))
+        # parameters (handlers may be passed either as Dict or List node)
+        settings = self.inputs.custodian.get('settings', None)
+        settings = settings.get_dict() if settings is not None else {}
+        handlers = self.inputs.custodian.get('handlers', None)
+        if isinstance(handlers, List):
+            handlers = handlers.get_list()
+        elif handlers is not None:
+            handlers = handlers.get_dict()
+        else:
+            handlers = {}
         # get the vasp run command and the stdout / stderr files
         vasp_cmd = self.vasp_run_line()
         stdout = self._default_output_file
@@ -270,6 +368,12 @@ class CalculationBase(CalcJob):
     def restart_copy_remote(self, folder, calcinfo):
         """
         Copy and write remote input files for a restarted VASP calcualtion
+
+        Large restart files (as defined by the plugin defaults) are
+        symlinked instead of copied if `restart.symlink_large_files` is set
+        and the parent calculation ran on the same computer. Note that in
+        this case the linked files are shared with the parent calculation
+        and will be overwritten by the restarted calculation.
         """
         # check the remote directory for files and build the remote copy
         # list
@@ -277,6 +381,15 @@ class CalculationBase(CalcJob):
         remote_comp_uuid = remote_data.computer.uuid
         exclude_files = self.restart_files_exclude()
         overwrite_poscar = self.inputs.restart.get('contcar_to_poscar', True)
+        # large files may only be symlinked if the parent calculation's
+        # remote folder is located on the same computer
+        symlink_files = set()
+        if self.inputs.restart.get('symlink_large_files', False):
+            if remote_comp_uuid == self.inputs.code.computer.uuid:
+                symlink_files = set(PluginDefaults.RESTART_SYMLINK_FNAMES)
+        remote_copy_entries = []
+        remote_symlink_entries = []
+        parent_folders = set()
         for name, abspath, relpath in self.remote_filelist(remote_data):
             if name in exclude_files:
                 continue
@@ -284,21 +397,27 @@ class CalculationBase(CalcJob):
             # to POSCAR
             if name == VaspDefaults.FNAMES['contcar'] and overwrite_poscar:
                 name = VaspDefaults.FNAMES['poscar']
-            file_relpath = relpath + '/' + name
-            remote_copy_entry = (remote_comp_uuid, abspath, file_relpath)
-            calcinfo.remote_copy_list.append(remote_copy_entry)
-            # copying files from remote to remote all parent folders need to
-            # exist in the target directory already since the internal copy
-            # mechanism is not capable of generating the required directories.
-            # however, in the very early stages of the submission and upload
-            # process, i.e. before any copylists are executed, AiiDA already
-            # copied the contents of the sandbox-folder to the remote working
-            # directory. Thus, all required parent folders can be generated by
-            # simply replicating the remote-folder structure inside the
-            # sandbox :)
-            file_parent_folder = pathlib.Path(folder.abspath) / relpath
-            if not file_parent_folder.exists():
-                file_parent_folder.mkdir(parents=True)
+            file_relpath = posixpath.join(relpath, name)
+            remote_entry = (remote_comp_uuid, abspath, file_relpath)
+            if name in symlink_files:
+                remote_symlink_entries.append(remote_entry)
+            else:
+                remote_copy_entries.append(remote_entry)
+            parent_folders.add(relpath)
+        # copying files from remote to remote all parent folders need to
+        # exist in the target directory already since the internal copy
+        # mechanism is not capable of generating the required directories.
+        # however, in the very early stages of the submission and upload
+        # process, i.e. before any copylists are executed, AiiDA already
+        # copied the contents of the sandbox-folder to the remote working
+        # directory. Thus, all required parent folders can be generated by
+        # simply replicating the remote-folder structure inside the
+        # sandbox :)
+        folder_abspath = folder.abspath
+        for relpath in parent_folders:
+            os.makedirs(os.path.join(folder_abspath, relpath), exist_ok=True)
+        calcinfo.remote_copy_list.extend(remote_copy_entries)
+        calcinfo.remote_symlink_list.extend(remote_symlink_entries)
 
     def retrieve_temporary_list(self):
         """
@@ -153,8 +153,7 @@ class VaspBasicCalculation(CalculationBase):
         Write the custodian input file to the calculation folder if a
         custodian code is defined.
         """
-        cstdn_code = self.inputs.custodian.get('code', False)
-        if cstdn_code:
-            custodian_settings = self.setup_custodian_settings(is_neb=False)
+        custodian_settings = self.setup_custodian_settings(is_neb=False)
+        if custodian_settings is not None:
             spec_fname = folder.get_abs_path(PluginDefaults.CSTDN_SPEC_FNAME)
             custodian_settings.write_custodian_spec(pathlib.Path(spec_fname))
@@ -90,23 +90,25 @@ class VaspCalculation(VaspBasicCalculation, VaspNebCalculation):
 
     def restart_files_exclude(self):
         """
-        Extend the default list of excluded files defined by the parent
+        Extend the default set of excluded files defined by the parent
         CalculationBase class if neccessary.
 
         As the sandbox folder gets uploaded in an early submission stage
         adding files given as inputs to a restarted calculation assures
         that those files are not overwritten by the possibly available
         corresponding remote file
+
+        :returns: frozenset of excluded file names
         """
-        # get the list of files excluded by default
+        # get the set of files excluded by default
         exclude = super(VaspCalculation, self).restart_files_exclude()
         # do not copy INCAR if defined as input
         if self.inputs.get('incar', False):
-            exclude += [VaspDefaults.FNAMES['incar']]
+            exclude |= {VaspDefaults.FNAMES['incar']}
         # do not copy KPOINTS if defined as input
         if self.inputs.get('kpoints', False):
-            exclude += [VaspDefaults.FNAMES['kpoints']]
-        return exclude
+            exclude |= {VaspDefaults.FNAMES['kpoints']}
+        return frozenset(exclude)
 
     def is_neb(self):
         remote_folder = self.inputs.restart.get('folder', False)
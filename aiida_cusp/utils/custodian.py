@@ -43,6 +43,9 @@ class CustodianSettings(object):
         self.stderr = stderr_fname
         self.stdout = stdout_fname
         self._is_neb = is_neb
+        # work on a copy of the passed settings since the contents are
+        # consumed by the setup methods below
+        settings = dict(settings)
         # setup VASP error handlers connected to the calculation
         self.custodian_handlers = self.setup_custodian_handlers(handlers)
         # setup VASP and Custodian program settings
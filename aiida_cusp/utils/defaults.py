@@ -95,6 +95,18 @@ class PluginDefaults(object):
         identifier = r"^{}[0-9]{{2}}$".format(cls.NEB_NODE_PREFIX)
         return re.compile(identifier)
 
+    # large VASP output files used to restart a calculation which may be
+    # symlinked instead of copied from the parent calculation's remote folder
+    @classproperty
+    def RESTART_SYMLINK_FNAMES(cls):
+        return [
+            VaspDefaults.FNAMES['wavecar'],
+            VaspDefaults.FNAMES['waveder'],
+            VaspDefaults.FNAMES['chgcar'],
+            VaspDefaults.FNAMES['chg'],
+            VaspDefaults.FNAMES['tmpcar'],
+        ]
+
     # default output namespace through which parsed calculation results
     # are added to the calculation
     @classproperty
@@ -89,6 +89,32 @@ def test_vasp_calculation_setup(vasp_code, cstdn_code, incar, kpoints, poscar,
     assert c.is_file() is True
 
 
+@pytest.mark.filterwarnings("ignore::UserWarning")
+def test_vasp_calculation_setup_no_custodian(vasp_code, incar, kpoints, poscar,
+                                            with_pbe_potcars, aiida_sandbox):
+    import pathlib
+    from aiida.plugins import CalculationFactory
+    from aiida_cusp.data import VaspPotcarData
+    from aiida_cusp.utils.defaults import PluginDefaults
+    # set the input plugin for code
+    vasp_code.set_attribute('input_plugin', 'cusp.vasp')
+    # setup calculation inputs without custodian code
+    inputs = {
+        'code': vasp_code,
+        'incar': incar,
+        'kpoints': kpoints,
+        'poscar': poscar,
+        'potcar': VaspPotcarData.from_structure(poscar, 'pbe'),
+        'metadata': {'options': {'resources': {'num_machines': 1}}},
+    }
+    VaspBasicCalculation = CalculationFactory('cusp.vasp')
+    vasp_calc = VaspBasicCalculation(inputs=inputs)
+    vasp_calc.prepare_for_submission(aiida_sandbox)
+    # assert no specfile was written to the folder
+    c = pathlib.Path(aiida_sandbox.abspath) / PluginDefaults.CSTDN_SPEC_FNAME
+    assert c.exists() is False
+
+
 @pytest.mark.parametrize('invalid_input', ['poscar', 'potcar'])
 def test_invalid_restart_inputs_raise(vasp_code, poscar, with_pbe_potcars,
                                       invalid_input):
@@ -57,6 +57,33 @@ def test_vasp_run_line_no_mpi(vasp_code):
     assert Base.vasp_run_line() == [vasp_code.get_execname()]
 
 
+def test_vasp_run_line_cached(vasp_code):
+    from aiida_cusp.calculators.calculation_base import CalculationBase
+    vasp_code.computer.set_default_mpiprocs_per_machine(1)
+    inputs = {
+        'code': vasp_code,
+        'metadata': {'options': {'resources': {'num_machines': 2}}},
+    }
+    Base = CalculationBase(inputs=inputs)
+    expected_runline = ['mpirun', '-np', '2', vasp_code.get_execname()]
+    assert Base.vasp_run_line() == expected_runline
+    # runline is cached and not affected by changes to the computer
+    vasp_code.computer.set_default_mpiprocs_per_machine(2)
+    assert Base.vasp_run_line() == expected_runline
+    # modifying the returned runline does not alter the cached runline
+    Base.vasp_run_line().append('-extra')
+    assert Base.vasp_run_line() == expected_runline
+    # modifying the returned mpi arguments does not alter the cached
+    # arguments (and thus the runline)
+    mpi_base_args, mpi_extra_args = Base.vasp_calc_mpi_args()
+    mpi_base_args.append('-extra')
+    mpi_extra_args.append('-extra')
+    assert Base.vasp_calc_mpi_args() == (['mpirun', '-np', '2'], [])
+    assert Base.inputs.metadata.options.mpirun_extra_params == []
+    Base._vasp_run_line = None  # force rebuild from cached mpi arguments
+    assert Base.vasp_run_line() == expected_runline
+
+
 @pytest.mark.parametrize('filename', ['MyFile', '.Hidden'])
 @pytest.mark.parametrize('relpath', ['.', '00', '01', '02', 'sub1',
                          'sub1/sub2', 'sub1/sub2/sub3', '.hidden1'])
@@ -93,6 +120,67 @@ def test_remote_folder_filelist(vasp_code, filename, relpath, aiida_sandbox):
     assert remote_filelist == expected_filelist
 
 
+def test_remote_folder_filelist_cached(vasp_code, aiida_sandbox):
+    import pathlib
+    from aiida.orm import RemoteData
+    from aiida_cusp.calculators.calculation_base import CalculationBase
+    sandbox = pathlib.Path(aiida_sandbox.abspath).absolute()
+    filepath = sandbox / 'MyFile'
+    filepath.touch()
+    remote = RemoteData(computer=vasp_code.computer, remote_path=str(sandbox))
+    inputs = {
+        'code': vasp_code,
+        'restart': {'folder': remote},
+        'metadata': {'options': {'resources': {'num_machines': 1}}},
+    }
+    Base = CalculationBase(inputs=inputs)
+    remote_filelist = Base.remote_filelist(remote)
+    assert remote_filelist == [('MyFile', str(filepath), '.')]
+    # removing the file does not change the result since the remote folder
+    # contents are cached after the first walk
+    filepath.unlink()
+    assert Base.remote_filelist(remote) == remote_filelist
+    # modifying the returned list does not alter the cached contents
+    Base.remote_filelist(remote).append(('Other', '/some/path', '.'))
+    assert Base.remote_filelist(remote) == remote_filelist
+    # resetting the cache walks the remote folder again
+    Base._remote_filelist_cache = {}
+    assert Base.remote_filelist(remote) == []
+
+
+def test_remote_folder_filelist_flat(vasp_code, aiida_sandbox, monkeypatch):
+    import pathlib
+    from aiida.orm import RemoteData
+    from aiida.transports.plugins.local import LocalTransport
+    from aiida_cusp.calculators.calculation_base import CalculationBase
+    sandbox = pathlib.Path(aiida_sandbox.abspath).absolute()
+    filenames = ['INCAR', 'KPOINTS', 'POSCAR', 'WAVECAR']
+    for filename in filenames:
+        (sandbox / filename).touch()
+    remote = RemoteData(computer=vasp_code.computer, remote_path=str(sandbox))
+    # count the folder listings performed on the remote
+    listings = []
+    listdir_withattributes = LocalTransport.listdir_withattributes
+
+    def counting_listdir(self, *args, **kwargs):
+        listings.append(self.getcwd())
+        return listdir_withattributes(self, *args, **kwargs)
+
+    monkeypatch.setattr(LocalTransport, 'listdir_withattributes',
+                        counting_listdir)
+    inputs = {
+        'code': vasp_code,
+        'restart': {'folder': remote},
+        'metadata': {'options': {'resources': {'num_machines': 1}}},
+    }
+    Base = CalculationBase(inputs=inputs)
+    remote_filelist = Base.remote_filelist(remote)
+    expected_filelist = [(f, str(sandbox / f), '.') for f in filenames]
+    assert sorted(remote_filelist) == sorted(expected_filelist)
+    # a flat folder is enumerated with a single listing
+    assert len(listings) == 1
+
+
 # FIXME: Setting a custom submit script name should be skippe for AiiDA
 #        versions below 1.2.1 where this option was first introduced
 #        if aiida.__version__ < 1.2.1 and submit_script_name:
@@ -130,6 +218,43 @@ def test_default_restart_files_exclude(submit_script_name, contcar_to_poscar,
     assert set(excluded_list) == set(expected_list)
 
 
+def test_setup_custodian_settings_no_custodian_code(vasp_code):
+    from aiida_cusp.calculators.calculation_base import CalculationBase
+    inputs = {
+        'code': vasp_code,
+        'metadata': {'options': {'resources': {'num_machines': 1}}},
+    }
+    Base = CalculationBase(inputs=inputs)
+    assert Base.setup_custodian_settings() is None
+
+
+@pytest.mark.parametrize('handler_node', ['Dict', 'List'])
+def test_setup_custodian_settings_handler_nodes(vasp_code, cstdn_code,
+                                                handler_node):
+    from aiida.orm import Dict, List
+    from aiida_cusp.utils.defaults import CustodianDefaults
+    from aiida_cusp.calculators.calculation_base import CalculationBase
+    handler_name = 'AliasingErrorHandler'
+    if handler_node == 'List':
+        handlers = List(list=[handler_name])
+    else:
+        handlers = Dict(dict={handler_name: {}})
+    inputs = {
+        'code': vasp_code,
+        'custodian': {'code': cstdn_code, 'handlers': handlers},
+        'metadata': {'options': {'resources': {'num_machines': 1}}},
+    }
+    Base = CalculationBase(inputs=inputs)
+    custodian_settings = Base.setup_custodian_settings()
+    # handlers passed as list are set up with their default parameters
+    import_path = ".".join([CustodianDefaults.HANDLER_IMPORT_PATH,
+                            handler_name])
+    expected_params = CustodianDefaults.ERROR_HANDLER_SETTINGS[handler_name]
+    assert custodian_settings.custodian_handlers == {
+        import_path: expected_params
+    }
+
+
 def test_undefined_create_calculation_inputs_raise(vasp_code, aiida_sandbox):
     from aiida.common import CalcInfo
     from aiida_cusp.calculators.calculation_base import CalculationBase
@@ -306,6 +431,83 @@ def test_calculation_restart_copy_remote(vasp_code, cstdn_code, tmpdir,
         assert calc_file_content != remote_content
 
 
+@pytest.mark.parametrize('relpath', ['.', '00'])
+@pytest.mark.parametrize('same_computer', [True, False])
+@pytest.mark.parametrize('symlink_large_files', [True, False])
+def test_calculation_restart_symlink_large_files(vasp_code, aiida_sandbox,
+                                                 tmpdir, symlink_large_files,
+                                                 same_computer, relpath):
+    import pathlib
+    from aiida.orm import RemoteData, Computer, User
+    from aiida.common import CalcInfo
+    from aiida_cusp.utils.defaults import VaspDefaults
+    from aiida_cusp.calculators.calculation_base import CalculationBase
+    # populate the remote folder with a large and a regular restart file
+    # located at the given subfolder (i.e. 00/WAVECAR for NEB calculations)
+    remote_path = pathlib.Path(tmpdir) / 'remote_dir'
+    (remote_path / relpath).mkdir(parents=True, exist_ok=True)
+    wavecar = VaspDefaults.FNAMES['wavecar']
+    incar = VaspDefaults.FNAMES['incar']
+    (remote_path / relpath / wavecar).touch()
+    (remote_path / relpath / incar).touch()
+    if same_computer:
+        remote_computer = vasp_code.computer
+    else:  # setup a different computer hosting the remote folder
+        remote_computer = Computer(name='other_computer',
+                                   hostname='localhost')
+        remote_computer.set_scheduler_type('direct')
+        remote_computer.set_transport_type('local')
+        remote_computer.set_workdir(str(tmpdir))
+        remote_computer.store()
+        remote_computer.configure(user=User.objects.get_default())
+    remote_data = RemoteData(computer=remote_computer,
+                             remote_path=str(remote_path))
+    inputs = {
+        'code': vasp_code,
+        'restart': {
+            'folder': remote_data,
+            'symlink_large_files': symlink_large_files,
+        },
+        'metadata': {'options': {'resources': {'num_machines': 1}}},
+    }
+    Base = CalculationBase(inputs=inputs)
+    calcinfo = CalcInfo()
+    calcinfo.remote_copy_list = []
+    calcinfo.remote_symlink_list = []
+    Base.restart_copy_remote(aiida_sandbox, calcinfo)
+    copied = [entry[2] for entry in calcinfo.remote_copy_list]
+    linked = [entry[2] for entry in calcinfo.remote_symlink_list]
+    incar_relpath = relpath + '/' + incar
+    wavecar_relpath = relpath + '/' + wavecar
+    # files are only symlinked if requested and the remote folder is
+    # located on the same computer
+    if symlink_large_files and same_computer:
+        assert copied == [incar_relpath]
+        assert linked == [wavecar_relpath]
+    else:
+        assert sorted(copied) == sorted([incar_relpath, wavecar_relpath])
+        assert linked == []
+    # parent folders are created for copied and symlinked files
+    assert (pathlib.Path(aiida_sandbox.abspath) / relpath).is_dir()
+
+
+def test_bulk_job_group_option(vasp_code):
+    from aiida_cusp.calculators.calculation_base import CalculationBase
+    inputs = {
+        'code': vasp_code,
+        'metadata': {
+            'options': {
+                'resources': {'num_machines': 1},
+                'bulk_job_group': 'my_bulk_group',
+            },
+        },
+    }
+    calc_base = CalculationBase(inputs=inputs)
+    assert calc_base.inputs.metadata.options.bulk_job_group == 'my_bulk_group'
+    # the tag is stored as option on the calculation node
+    assert calc_base.node.get_option('bulk_job_group') == 'my_bulk_group'
+
+
 def test_temporary_retrieve_list(vasp_code):
     from aiida_cusp.calculators.calculation_base import CalculationBase
     # the expected retrieve list
@@ -88,6 +88,33 @@ def test_wrong_neb_path_identifer_raises(vasp_code, cstdn_code, incar, kpoints,
     assert err_msg in str(exception.value)
 
 
+@pytest.mark.filterwarnings("ignore::UserWarning")
+def test_vasp_neb_calculation_setup_no_custodian(vasp_code, incar, kpoints,
+                                                 poscar, with_pbe_potcars,
+                                                 aiida_sandbox):
+    import pathlib
+    from aiida.plugins import CalculationFactory
+    from aiida_cusp.data import VaspPotcarData
+    from aiida_cusp.utils.defaults import PluginDefaults
+    # set the input plugin for code
+    vasp_code.set_attribute('input_plugin', 'cusp.vasp')
+    # setup calculation inputs without custodian code
+    inputs = {
+        'code': vasp_code,
+        'incar': incar,
+        'kpoints': kpoints,
+        'neb_path': {'node_00': poscar, 'node_01': poscar, 'node_02': poscar},
+        'potcar': VaspPotcarData.from_structure(poscar, 'pbe'),
+        'metadata': {'options': {'resources': {'num_machines': 1}}},
+    }
+    VaspCalculation = CalculationFactory('cusp.vasp')
+    vasp_neb_calc = VaspCalculation(inputs=inputs)
+    vasp_neb_calc.prepare_for_submission(aiida_sandbox)
+    # assert no specfile was written to the folder
+    c = pathlib.Path(aiida_sandbox.abspath) / PluginDefaults.CSTDN_SPEC_FNAME
+    assert c.exists() is False
+
+
 # ignore BadPotcarWarning raised by pymatgen. i don't care if pymatgen does
 # not like my test "potential"
 @pytest.mark.filterwarnings("ignore::UserWarning")
@@ -75,6 +75,40 @@ def test_is_neb(vasp_code, poscar, is_restart, is_neb):
     assert result is is_neb
 
 
+@pytest.mark.parametrize('use_incar', [True, False])
+@pytest.mark.parametrize('use_kpoints', [True, False])
+def test_restart_files_exclude(vasp_code, incar, kpoints, use_incar,
+                               use_kpoints):
+    from aiida.orm import RemoteData
+    from aiida.plugins import CalculationFactory
+    from aiida_cusp.utils.defaults import PluginDefaults, VaspDefaults
+    # define code
+    vasp_code.set_attribute('input_plugin', 'cusp.vasp')
+    # setup restarted calculation
+    remote_data = RemoteData(computer=vasp_code.computer, remote_path='')
+    inputs = {
+        'code': vasp_code,
+        'restart': {'folder': remote_data},
+        'metadata': {'options': {'resources': {'num_machines': 1}}},
+    }
+    if use_incar:
+        inputs.update({'incar': incar})
+    if use_kpoints:
+        inputs.update({'kpoints': kpoints})
+    VaspCalculation = CalculationFactory('cusp.vasp')
+    vasp_calc = VaspCalculation(inputs=inputs)
+    expected = {'job_tmpl.json', 'calcinfo.json', '_aiidasubmit.sh',
+                PluginDefaults.CSTDN_SPEC_FNAME, VaspDefaults.FNAMES['poscar']}
+    # input files defined for the restart must not be copied from remote
+    if use_incar:
+        expected.add(VaspDefaults.FNAMES['incar'])
+    if use_kpoints:
+        expected.add(VaspDefaults.FNAMES['kpoints'])
+    excluded = vasp_calc.restart_files_exclude()
+    assert isinstance(excluded, frozenset)
+    assert excluded == expected
+
+
 @pytest.mark.parametrize('calc_type', ['normal', 'neb'])
 @pytest.mark.filterwarnings("ignore::UserWarning")
 def test_all_calculation_inputs(vasp_code, cstdn_code, incar, kpoints, poscar,